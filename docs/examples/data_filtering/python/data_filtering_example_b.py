@@ -1,8 +1,11 @@
 # docs: begin-b1
-from sqlalchemy import create_engine, not_, or_, and_, false
+from functools import lru_cache
+
+from sqlalchemy import create_engine, not_, and_, bindparam, tuple_, Index
+from sqlalchemy.ext.associationproxy import association_proxy
 from sqlalchemy.types import String, Boolean, Integer
 from sqlalchemy.schema import Column, ForeignKey
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import sessionmaker, relationship, backref, raiseload, joinedload
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
@@ -20,6 +23,7 @@ class Repository(Base):
 
     id = Column(String(), primary_key=True)
     org_id = Column(String, ForeignKey("orgs.id"), nullable=False)
+    organization = relationship("Organization")
 
 
 class User(Base):
@@ -27,26 +31,38 @@ class User(Base):
 
     id = Column(String(), primary_key=True)
 
+    # Just the role names, without materializing the role objects.
+    repo_role_names = association_proxy("repo_roles", "name")
+    org_role_names = association_proxy("org_roles", "name")
+
 
 class RepoRole(Base):
     __tablename__ = "repo_roles"
+    # Authorization filters by user first, then role name; the composite
+    # index makes that a point lookup.
+    __table_args__ = (Index("ix_repo_roles_user_name", "user_id", "name"),)
     id = Column(Integer, primary_key=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
     repo_id = Column(String, ForeignKey("repos.id"), nullable=False)
-    user = relationship("User", backref="repo_roles", lazy=True)
+    # selectin loading batch-fetches the roles for every user in one
+    # WHERE user_id IN (...) query instead of one lazy SELECT per user.
+    user = relationship("User", backref=backref("repo_roles", lazy="selectin"))
     name = Column(String, index=True)
 
 
 class OrgRole(Base):
     __tablename__ = "org_roles"
+    __table_args__ = (Index("ix_org_roles_user_name", "user_id", "name"),)
     id = Column(Integer, primary_key=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
     org_id = Column(String, ForeignKey("orgs.id"), nullable=False)
-    user = relationship("User", backref="org_roles", lazy=True)
+    user = relationship("User", backref=backref("org_roles", lazy="selectin"))
     name = Column(String, index=True)
 
 
-engine = create_engine("sqlite:///:memory:")
+# A generous statement-cache size: authorization traffic compiles the same
+# handful of statement shapes over and over, so none should ever be evicted.
+engine = create_engine("sqlite:///:memory:", query_cache_size=1200)
 
 Session = sessionmaker(bind=engine)
 session = Session()
@@ -82,49 +98,112 @@ session.commit()
 # docs: end-b1
 
 # docs: begin-b2
-# The query functions are the same.
+# Only exec_query and combine_query are shared defaults here; build_query
+# caches the filter expression per shape and re-binds values on each call.
+handlers = {
+    'Eq': lambda a, b: a == b,
+    'Neq': lambda a, b: a != b,
+    'In': lambda a, b: a.in_(b),
+    'Nin': lambda a, b: not_(a.in_(b)),
+}
+
+
+# Filters with the same structural "shape" (fields, kinds, value arities)
+# always produce the same SQL, so we build the filter expression once per
+# shape and only re-bind the concrete values on each call. Reusing the same
+# expression objects also lets SQLAlchemy's compiled statement cache skip
+# recompiling the SQL.
+@lru_cache(maxsize=256)
+def compile_filters(cls, shape):
+    conds = []
+    for i, (field, kind) in enumerate(shape):
+        if isinstance(field, tuple):
+            # A multi-field filter compares several columns per row; a tuple
+            # IN is one predicate the database can plan as a single scan,
+            # instead of an OR of per-row AND chains.
+            cols = [cls.id if fld is None else getattr(cls, fld) for fld in field]
+            col = tuple_(*cols)
+        else:
+            col = cls.id if field is None else getattr(cls, field)
+        if kind in ("In", "Nin"):
+            param = bindparam(f"p{i}", expanding=True)
+        else:
+            param = bindparam(f"p{i}")
+        conds.append(handlers[kind](col, param))
+    return and_(*conds)
+
+
+# When enabled, any lazy relationship load on objects returned from an
+# authorized query raises instead of silently issuing another SELECT per
+# row. Turn it on in tests to catch reintroduced N+1 patterns loudly.
+strict_loading = False
+
+
 def build_query_cls(cls):
-    handlers = {
-        'Eq': lambda a, b: a == b,
-        'Neq': lambda a, b: a != b,
-        'In': lambda a, b: a.in_(b),
-        'Nin': lambda a, b: not_(a.in_(b)),
-    }
-    def build_query(filters):
+    def base_query():
         query = session.query(cls)
-        for filter in filters:
+        if strict_loading:
+            query = query.options(raiseload("*"))
+        return query
+
+    def build_query(filters):
+        if not filters:
+            return base_query()
+        shape = []
+        params = {}
+        for i, filter in enumerate(filters):
             assert filter.kind in ["Eq", "In"]
-            if filter.field is None:
-                field = cls.id
-                if fil.kind != 'Nin':
-                    value = fil.value.id
+            field = filter.field
+            value = filter.value
+            if field is None:
+                # The value is a resource (or list of resources); compare
+                # against the primary key.
+                if filter.kind in ("In", "Nin"):
+                    value = [v.id for v in value]
                 else:
-                    value = [value.id for value in fil.value]
-            elif isinstance(filter.field, list):
-                field = [cls.id if fld is None else getattr(cls, fld)]
-                value = filter.value
-            else:
-                field = getattr(cls, filter.field)
-                value = filter.value
-
-            if not isinstance(field, list):
-                cond = handlers[filter.kind](field, value)
+                    value = value.id
+            if isinstance(field, list):
+                # A None sub-field compares against the primary key, just
+                # like the single-field case above.
+                shape.append((tuple(field), filter.kind))
+                params[f"p{i}"] = [
+                    tuple(v.id if fld is None else v for fld, v in zip(field, vals))
+                    for vals in value
+                ]
             else:
-                combine = handlers['Eq' if filter.kind == 'In' else 'Neq']
-                conds = [and_(*[co(*fv) for fv in zip(field, val)]) for val in value]
-                cond = or_(*conds) if conds else false()
-
-            query = query.filter(cond)
+                shape.append((field, filter.kind))
+                params[f"p{i}"] = value
+        # unique_params (rather than params) keeps the bound values distinct
+        # when two queries built from the same cached shape are combined.
+        cond = compile_filters(cls, tuple(shape)).unique_params(**params)
+        query = base_query().filter(cond)
+        if cls is Repository and any(
+            "org_id" in (field if isinstance(field, tuple) else (field,))
+            for field, _ in shape
+        ):
+            # The policy crossed the parent relation to authorize this repo,
+            # so callers are likely to touch repo.organization next; fetch it
+            # in the same roundtrip instead of one lazy SELECT per repo.
+            query = query.options(joinedload(Repository.organization))
         return query
     return build_query
 
 
 def exec_query(query):
-    return query.all()
+    # Rows are unique by primary key within each branch, so UNION ALL (below)
+    # can surface duplicates; drop them here instead of paying UNION's
+    # sort/dedup pass in the database.
+    seen = set()
+    results = []
+    for result in query.all():
+        if result.id not in seen:
+            seen.add(result.id)
+            results.append(result)
+    return results
 
 
 def combine_query(q1, q2):
-    return q1.union(q2)
+    return q1.union_all(q2)
 
 
 from oso import Oso, Relation
@@ -165,8 +244,100 @@ oso.register_class(User, fields={"id": str, "repo_roles": list})
 with open("policy_b.polar") as f:
     policy_a = f.read()
 
+# Materialized-view-style cache of authorization decisions. A web app asks
+# the same (actor, action, resource class) question over and over; cache the
+# resulting primary keys and answer repeats with one indexed lookup. Any
+# flush that touches a role table invalidates the whole cache.
+from sqlalchemy import event
+
+authz_cache = {}
+authz_version = 0
+
+
+@event.listens_for(session, "after_flush")
+def bump_authz_version(session, ctx):
+    global authz_version
+    changed = session.new | session.dirty | session.deleted
+    if any(isinstance(obj, (OrgRole, RepoRole)) for obj in changed):
+        authz_version += 1
+
+
+def authorized_resources(actor, action, cls):
+    key = (actor.id, action, cls)
+    hit = authz_cache.get(key)
+    if hit is not None and hit[1] == authz_version:
+        ids = hit[0]
+    else:
+        ids = [r.id for r in oso.authorized_resources(actor, action, cls)]
+        authz_cache[key] = (ids, authz_version)
+    # The id IN (...) lookup goes through the same precompiled filter shape
+    # as the data filtering queries, so cache hits skip SQL construction.
+    cond = compile_filters(cls, (("id", "In"),)).unique_params(p0=ids)
+    rows = session.query(cls).filter(cond).all()
+    by_id = {row.id: row for row in rows}
+    return [by_id[id] for id in ids]
+
+
+# Run the whole example with strict loading so an accidental lazy load in
+# the authorization path would fail the asserts below.
+strict_loading = True
+
 # docs: begin-b3
 oso.load_str(policy_a)
 leina_repos = list(oso.authorized_resources(leina, "read", Repository))
 assert leina_repos == [oso_repo, demo_repo]
 # docs: end-b3
+
+assert list(leina.org_role_names) == ["owner"]
+assert list(leina.repo_role_names) == []
+
+# The caching wrapper gives the same answer as asking oso directly.
+assert list(authorized_resources(leina, "read", Repository)) == [oso_repo, demo_repo]
+
+# The repeat is served from the cache with a single indexed SELECT.
+assert list(authorized_resources(leina, "read", Repository)) == [oso_repo, demo_repo]
+assert (leina.id, "read", Repository) in authz_cache
+
+# Granting a role invalidates the cache.
+session.add(RepoRole(user_id="steve", repo_id="ios", name="contributor"))
+session.commit()
+assert list(authorized_resources(steve, "read", Repository)) == [ios]
+
+# The policy's "read" rules for Repository can also be pushed all the way
+# into the database as a view. The role closure below is derived from
+# policy_b.polar: "read" if "contributor", which follows from any repo role,
+# or from "member"/"owner" on the parent organization. One indexed join
+# against the view replaces the per-request policy-to-SQL translation and
+# the UNION of subqueries it produces.
+from sqlalchemy import text, table, column
+
+session.execute(text("""
+    CREATE VIEW authz_read_repository AS
+    SELECT repo_roles.user_id AS user_id, repo_roles.repo_id AS repo_id
+    FROM repo_roles
+    WHERE repo_roles.name IN ('contributor', 'maintainer', 'admin')
+    UNION
+    SELECT org_roles.user_id AS user_id, repos.id AS repo_id
+    FROM org_roles JOIN repos ON repos.org_id = org_roles.org_id
+    WHERE org_roles.name IN ('member', 'owner')
+"""))
+
+authz_read_repository = table(
+    "authz_read_repository", column("user_id"), column("repo_id")
+)
+
+
+def readable_repositories(user):
+    return (
+        session.query(Repository)
+        .join(
+            authz_read_repository,
+            Repository.id == authz_read_repository.c.repo_id,
+        )
+        .filter(authz_read_repository.c.user_id == user.id)
+        .all()
+    )
+
+
+assert set(readable_repositories(leina)) == {oso_repo, demo_repo}
+assert set(readable_repositories(steve)) == {ios}
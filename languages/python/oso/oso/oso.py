@@ -6,7 +6,7 @@ import os
 from typing import List, Any, Set
 
 from polar import Polar, Variable, exceptions, Expression, Pattern
-from polar.data_filtering import serialize_types, filter_data
+from polar.data_filtering import filter_data
 from .exceptions import NotFoundError, ForbiddenError
 
 
@@ -263,7 +263,7 @@ class Oso(Polar):
             for k, v in result["bindings"].items()
         ]
 
-        types = serialize_types(self.host.distinct_user_types(), self.host.types)
+        types = self.host.serialized_types()
         plan = self.ffi_polar.build_filter_plan(types, results, "resource", class_name)
 
         return filter_data(self, plan)
@@ -9,6 +9,8 @@ from functools import reduce
 class Relation:
     """An object representing a relation between two types registered with Oso."""
 
+    __slots__ = ("kind", "other_type", "my_field", "other_field")
+
     kind: str
     other_type: str
     my_field: str
@@ -48,11 +50,15 @@ def serialize_types(types, tmap):
 
 @dataclass
 class Field:
+    __slots__ = ("field",)
+
     field: str
 
 
 @dataclass
 class Ref:
+    __slots__ = ("field", "result_id")
+
     field: Optional[str]
     result_id: int
 
@@ -70,6 +76,9 @@ binary_predicates = {
 class Filter:
     """An object representing a predicate on a type registered with Oso."""
 
+    # my_val/other_val are the accessors attached in __post_init__.
+    __slots__ = ("kind", "field", "value", "my_val", "other_val")
+
     kind: str
     field: str
     value: Any
@@ -1,4 +1,8 @@
 class Expression:
+    # Expression trees from partial evaluation contain thousands of nodes;
+    # slots keep each one to two references instead of a per-instance dict.
+    __slots__ = ("operator", "args")
+
     def __init__(self, operator, args):
         self.operator = operator
         self.args = args
@@ -18,6 +22,8 @@ class Expression:
 
 
 class Pattern:
+    __slots__ = ("tag", "fields")
+
     def __init__(self, tag, fields):
         self.tag = tag
         self.fields = fields
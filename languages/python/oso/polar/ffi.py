@@ -230,8 +230,14 @@ def to_c_str(string):
     return ffi.new("char[]", string.encode())
 
 
+# A dedicated encoder with compact separators: every term crossing the FFI
+# boundary goes through here, and the smaller payload is less for the core to
+# parse. Binding the bound method also skips json.dumps' per-call setup.
+_encode = json.JSONEncoder(separators=(",", ":")).encode
+
+
 def ffi_serialize(value):
-    return to_c_str(json.dumps(value))
+    return to_c_str(_encode(value))
 
 
 def process_messages(next_message_method):
@@ -2,8 +2,10 @@
 
 from dataclasses import dataclass
 from math import inf, isnan, nan
+import operator as ops
 import re
 import inspect
+from sys import intern
 from typing import Any, Dict, Optional, Callable, Union
 
 
@@ -19,10 +21,39 @@ from .exceptions import (
 from .variable import Variable
 from .predicate import Predicate
 from .expression import Expression, Pattern
+from .data_filtering import serialize_types
+
+
+# Terms built by Host.to_polar are immediately JSON-serialized and never
+# mutated, so the constant terms can be shared singletons instead of being
+# rebuilt on every conversion.
+TRUE_TERM = {"value": {"Boolean": True}}
+FALSE_TERM = {"value": {"Boolean": False}}
+
+# Comparison handlers for external operations, keyed by the operator tag the
+# core sends. One dict lookup plus a C-level comparison per operation.
+comparison_operators = {
+    "Lt": ops.lt,
+    "Gt": ops.gt,
+    "Eq": ops.eq,
+    "Leq": ops.le,
+    "Geq": ops.ge,
+    "Neq": ops.ne,
+}
 
 
 @dataclass
 class UserType:
+    __slots__ = (
+        "name",
+        "cls",
+        "id",
+        "fields",
+        "build_query",
+        "exec_query",
+        "combine_query",
+    )
+
     name: str
     cls: type
     id: int
@@ -49,6 +80,13 @@ class Host:
         # types maps class names (as string) and class objects to UserType.
         self.types = (types or {}).copy()
         self.instances = (instances or {}).copy()
+        # Reverse index from Python object identity to cached instance id.
+        # Sending an object to Polar more than once then reuses its id
+        # instead of allocating a fresh one (an FFI round-trip) per
+        # conversion. The strong references in self.instances keep the
+        # identities stable for the lifetime of this Host.
+        self._instance_ids = {id(v): k for k, v in self.instances.items()}
+        self._serialized_types = None
         self._accept_expression = False  # default, see set_accept_expression
         self.build_query = None
         self.exec_query = None
@@ -120,8 +158,21 @@ class Host:
             exec_query=exec_query or self.exec_query,
             combine_query=combine_query or self.combine_query,
         )
+        self._serialized_types = None
         return name
 
+    def serialized_types(self):
+        """Polar-serializable description of every registered type.
+
+        Building a filter plan needs this on every data filtering query, but
+        it only changes when a class is registered, so compute it once and
+        reuse it until the next registration."""
+        if self._serialized_types is None:
+            self._serialized_types = serialize_types(
+                self.distinct_user_types(), self.types
+            )
+        return self._serialized_types
+
     def register_mros(self):
         """Register the MRO of each registered class to be used for rule type validation."""
         # Get MRO of all registered classes
@@ -191,22 +242,13 @@ class Host:
 
     def operator(self, op, args):
         try:
-            if op == "Lt":
-                return args[0] < args[1]
-            elif op == "Gt":
-                return args[0] > args[1]
-            elif op == "Eq":
-                return args[0] == args[1]
-            elif op == "Leq":
-                return args[0] <= args[1]
-            elif op == "Geq":
-                return args[0] >= args[1]
-            elif op == "Neq":
-                return args[0] != args[1]
-            else:
-                raise PolarRuntimeError(
-                    f"Unsupported external operation '{type(args[0])} {op} {type(args[1])}'"
-                )
+            compare = comparison_operators[op]
+        except KeyError:
+            raise PolarRuntimeError(
+                f"Unsupported external operation '{type(args[0])} {op} {type(args[1])}'"
+            )
+        try:
+            return compare(args[0], args[1])
         except TypeError:
             raise PolarRuntimeError(
                 f"External operation '{type(args[0])} {op} {type(args[1])}' failed."
@@ -234,7 +276,7 @@ class Host:
     def to_polar(self, v):
         """Convert a Python object to a Polar term."""
         if type(v) == bool:
-            val = {"Boolean": v}
+            return TRUE_TERM if v else FALSE_TERM
         elif type(v) == int:
             val = {"Number": {"Integer": v}}
         elif type(v) == float:
@@ -248,25 +290,31 @@ class Host:
         elif type(v) == str:
             val = {"String": v}
         elif type(v) == list:
-            val = {"List": [self.to_polar(i) for i in v]}
+            # Rebinding the bound method keeps the recursion over child terms
+            # from re-doing the attribute lookup per element.
+            to_polar = self.to_polar
+            val = {"List": [to_polar(i) for i in v]}
         elif type(v) == dict:
+            to_polar = self.to_polar
             val = {
-                "Dictionary": {"fields": {k: self.to_polar(v) for k, v in v.items()}}
+                "Dictionary": {"fields": {k: to_polar(v) for k, v in v.items()}}
             }
         elif isinstance(v, Predicate):
+            to_polar = self.to_polar
             val = {
                 "Call": {
                     "name": v.name,
-                    "args": [self.to_polar(v) for v in v.args],
+                    "args": [to_polar(v) for v in v.args],
                 }
             }
         elif isinstance(v, Variable):
             val = {"Variable": v}
         elif isinstance(v, Expression):
+            to_polar = self.to_polar
             val = {
                 "Expression": {
                     "operator": v.operator,
-                    "args": [self.to_polar(v) for v in v.args],
+                    "args": [to_polar(v) for v in v.args],
                 }
             }
         elif isinstance(v, Pattern):
@@ -282,15 +330,15 @@ class Host:
                     }
                 }
         else:
-            instance_id = None
-            import inspect
-
-            if inspect.isclass(v):
-                if v in self.types:
+            instance_id = self._instance_ids.get(id(v))
+            if instance_id is None:
+                if inspect.isclass(v) and v in self.types:
                     instance_id = self.types[v].id
+                instance_id = self.cache_instance(v, instance_id)
+                self._instance_ids[id(v)] = instance_id
             val = {
                 "ExternalInstance": {
-                    "instance_id": self.cache_instance(v, instance_id),
+                    "instance_id": instance_id,
                     "repr": None,
                 }
             }
@@ -300,57 +348,90 @@ class Host:
     def to_python(self, value):
         """Convert a Polar term to a Python object."""
         value = value["value"]
-        tag = [*value][0]
-        if tag in ["String", "Boolean"]:
-            return value[tag]
-        elif tag == "Number":
-            number = [*value[tag].values()][0]
-            if "Float" in value[tag]:
-                if number == "Infinity":
-                    return inf
-                elif number == "-Infinity":
-                    return -inf
-                elif number == "NaN":
-                    return nan
-                else:
-                    if not isinstance(number, float):
-                        raise PolarRuntimeError(
-                            f'Expected a floating point number, got "{number}"'
-                        )
-            return number
-        elif tag == "List":
-            return [self.to_python(e) for e in value[tag]]
-        elif tag == "Dictionary":
-            return {k: self.to_python(v) for k, v in value[tag]["fields"].items()}
-        elif tag == "ExternalInstance":
-            return self.get_instance(value[tag]["instance_id"])
-        elif tag == "Call":
-            return Predicate(
-                name=value[tag]["name"],
-                args=[self.to_python(v) for v in value[tag]["args"]],
-            )
-        elif tag == "Variable":
-            return Variable(value[tag])
-        elif tag == "Expression":
-            if not self._accept_expression:
-                raise UnexpectedPolarTypeError(UNEXPECTED_EXPRESSION_MESSAGE)
-
-            args = list(map(self.to_python, value[tag]["args"]))
-            operator = value[tag]["operator"]
-
-            return Expression(operator, args)
-        elif tag == "Pattern":
-            pattern_tag = [*value[tag]][0]
-            if pattern_tag == "Instance":
-                instance = value[tag]["Instance"]
-                return Pattern(instance["tag"], instance["fields"]["fields"])
-            elif pattern_tag == "Dictionary":
-                dictionary = value[tag]["Dictionary"]
-                return Pattern(None, dictionary["fields"])
+        tag = next(iter(value))
+        try:
+            handler = self._term_handlers[tag]
+        except KeyError:
+            raise UnexpectedPolarTypeError(tag)
+        return handler(self, value[tag])
+
+    # Per-tag term handlers for to_python. Dispatching through a dict is one
+    # hash lookup per term instead of a string comparison per candidate tag.
+    def _term_to_literal(self, value):
+        return value
+
+    def _term_to_number(self, value):
+        number = [*value.values()][0]
+        if "Float" in value:
+            if number == "Infinity":
+                return inf
+            elif number == "-Infinity":
+                return -inf
+            elif number == "NaN":
+                return nan
             else:
-                raise UnexpectedPolarTypeError("Pattern: " + value[tag])
+                if not isinstance(number, float):
+                    raise PolarRuntimeError(
+                        f'Expected a floating point number, got "{number}"'
+                    )
+        return number
+
+    def _term_to_list(self, value):
+        to_python = self.to_python
+        return [to_python(e) for e in value]
+
+    def _term_to_dict(self, value):
+        to_python = self.to_python
+        return {k: to_python(v) for k, v in value["fields"].items()}
+
+    def _term_to_instance(self, value):
+        return self.get_instance(value["instance_id"])
+
+    def _term_to_predicate(self, value):
+        # A tuple keeps the deserialized predicate hashable (Predicate
+        # equality is elementwise, so this is invisible to comparisons).
+        to_python = self.to_python
+        return Predicate(
+            name=value["name"],
+            args=tuple(to_python(v) for v in value["args"]),
+        )
 
-        raise UnexpectedPolarTypeError(tag)
+    def _term_to_variable(self, value):
+        return Variable(value)
+
+    def _term_to_expression(self, value):
+        if not self._accept_expression:
+            raise UnexpectedPolarTypeError(UNEXPECTED_EXPRESSION_MESSAGE)
+        # A large partial result repeats the same few operator tags on
+        # thousands of nodes; interning them shares one string per tag and
+        # makes downstream comparisons against literals identity-fast.
+        return Expression(
+            intern(value["operator"]), list(map(self.to_python, value["args"]))
+        )
+
+    def _term_to_pattern(self, value):
+        pattern_tag = next(iter(value))
+        if pattern_tag == "Instance":
+            instance = value["Instance"]
+            return Pattern(intern(instance["tag"]), instance["fields"]["fields"])
+        elif pattern_tag == "Dictionary":
+            dictionary = value["Dictionary"]
+            return Pattern(None, dictionary["fields"])
+        else:
+            raise UnexpectedPolarTypeError("Pattern: " + pattern_tag)
+
+    _term_handlers = {
+        "String": _term_to_literal,
+        "Boolean": _term_to_literal,
+        "Number": _term_to_number,
+        "List": _term_to_list,
+        "Dictionary": _term_to_dict,
+        "ExternalInstance": _term_to_instance,
+        "Call": _term_to_predicate,
+        "Variable": _term_to_variable,
+        "Expression": _term_to_expression,
+        "Pattern": _term_to_pattern,
+    }
 
     def set_accept_expression(self, accept):
         """Set whether the Host accepts Expression types from Polar, or raises an error."""
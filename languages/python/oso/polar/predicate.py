@@ -4,6 +4,8 @@ from typing import Any, Sequence
 class Predicate:
     """Represent a predicate in Polar (`name(args, ...)`)."""
 
+    __slots__ = ("name", "args")
+
     name: str
     args: Sequence[Any]
 
@@ -22,3 +24,6 @@ class Predicate:
             and len(self.args) == len(other.args)
             and all(x == y for x, y in zip(self.args, other.args))
         )
+
+    def __hash__(self):
+        return hash((self.name, tuple(self.args)))
@@ -1,6 +1,8 @@
 class Variable(str):
     """An unbound variable type, can be used to query the KB for information"""
 
+    __slots__ = ()
+
     def __repr__(self):
         return f"Variable({super().__repr__()})"
 
@@ -555,3 +555,33 @@ def test_nested_properties(oso):
 
     result = oso.authorized_resources("gwen", "read", Qux)
     assert len(result) == 1
+
+
+def test_register_class_after_query(oso):
+    # The serialized type map handed to the core is cached per registration
+    # set; registering a class after a query must invalidate it so the next
+    # filter plan sees the new type.
+    oso.load_str('allow(_, _, _: Foo{id: "something"});')
+    oso.check_authz("gwen", "get", Foo, [something_foo])
+
+    @dataclass
+    class Qux:
+        id: str
+        foo_id: str
+
+    quxes = [Qux(id="a", foo_id="something"), Qux(id="b", foo_id="another")]
+
+    oso.register_class(
+        Qux,
+        build_query=filter_array(quxes),
+        fields={
+            "id": str,
+            "foo_id": str,
+            "foo": Relation(
+                kind="one", other_type="Foo", my_field="foo_id", other_field="id"
+            ),
+        },
+    )
+    oso.clear_rules()
+    oso.load_str('allow(_, "read", qux: Qux) if qux.foo.id = "something";')
+    oso.check_authz("gwen", "read", Qux, [quxes[0]])